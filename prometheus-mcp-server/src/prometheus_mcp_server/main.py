@@ -1,14 +1,14 @@
 #!/usr/bin/env python
 import sys
-import dotenv
-from prometheus_mcp_server.server import mcp, config, TransportType
+from prometheus_mcp_server.server import mcp, config, TransportType, _DOTENV_LOADED
 from prometheus_mcp_server.logging_config import setup_logging
 
 # Initialize structured logging
 logger = setup_logging()
 
 def setup_environment():
-    if dotenv.load_dotenv():
+    # .env was already loaded when server.py was imported; reuse that result
+    if _DOTENV_LOADED:
         logger.info("Configuração de ambiente carregada", source="arquivo .env")
     else:
         logger.info("Configuração de ambiente carregada", source="variáveis de ambiente", note="Nenhum .env encontrado")
@@ -25,7 +25,8 @@ def setup_environment():
     # MCP Server configuration validation
     mcp_config = config.mcp_server_config
     if mcp_config:
-        if str(mcp_config.mcp_server_transport).lower() not in TransportType.values():
+        # MCPServerConfig coerces valid transports to the enum at load time
+        if not isinstance(mcp_config.mcp_server_transport, TransportType):
             logger.error(
                 "Transporte MCP inválido",
                 error="Variável PROMETHEUS_MCP_SERVER_TRANSPORT inválida",
@@ -71,8 +72,10 @@ def run_server():
     
     mcp_config = config.mcp_server_config
     transport = mcp_config.mcp_server_transport
+    if isinstance(transport, TransportType):
+        transport = transport.value
 
-    http_transports = [TransportType.HTTP.value, TransportType.SSE.value]
+    http_transports = (TransportType.HTTP.value, TransportType.SSE.value)
     if transport in http_transports:
         mcp.run(transport=transport, host=mcp_config.mcp_bind_host, port=mcp_config.mcp_bind_port)
         logger.info("Starting Prometheus MCP Server", 
@@ -2,27 +2,145 @@
 
 import os
 import json
+import re
+import logging
+import asyncio
+import functools
 from typing import Any, Dict, List, Optional, Union
 from dataclasses import dataclass
 import time
-from datetime import datetime, timedelta
 from enum import Enum
+from urllib.parse import urlencode
 
 import dotenv
+import orjson
 import requests
+from requests.adapters import HTTPAdapter, Retry
 from fastmcp import FastMCP, Context
 from prometheus_mcp_server.logging_config import get_logger
 
-dotenv.load_dotenv()
+# Load .env exactly once per process; main.setup_environment logs this result
+# instead of re-walking the filesystem for a second load.
+_DOTENV_LOADED = dotenv.load_dotenv()
 mcp = FastMCP("Prometheus MCP")
 
-# Cache for metrics list to improve completion performance
-_metrics_cache = {"data": None, "timestamp": 0}
+# Shared HTTP session so repeated Prometheus requests reuse pooled keepalive
+# connections instead of paying a TCP/TLS handshake per call
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(total=2, backoff_factor=0.1, status_forcelist=[502, 503, 504]),
+)
+_SESSION.mount("http://", _adapter)
+_SESSION.mount("https://", _adapter)
+
+# (connect, read) timeouts for every Prometheus API request
+_REQUEST_TIMEOUT = (3.05, 30)
+
+# Cache for metrics list to improve completion performance. "lower" holds a
+# parallel pre-lowercased copy so case-insensitive searches do not re-lowercase
+# every metric name on every call.
+_metrics_cache = {"data": None, "lower": None, "timestamp": 0}
 _CACHE_TTL = 300  # 5 minutes
 
+# Caches for scrape targets and per-metric metadata. Targets change more often
+# than metric names, so they get a much shorter TTL; metadata is as stable as
+# the metric list itself.
+_targets_cache = {"data": None, "timestamp": 0}
+_TARGETS_CACHE_TTL = 30  # seconds
+_metadata_cache: Dict[str, Any] = {}  # metric -> {"data": ..., "timestamp": ...}
+_METADATA_CACHE_TTL = 300  # 5 minutes
+
+
+def invalidate_prometheus_caches() -> None:
+    """Drop all cached Prometheus responses (metrics, targets, metadata).
+
+    Useful when the upstream Prometheus changes (e.g. new scrape configs) and
+    callers need fresh data before the TTLs expire.
+    """
+    _metrics_cache.update(data=None, lower=None, timestamp=0)
+    _targets_cache.update(data=None, timestamp=0)
+    _metadata_cache.clear()
+
 # Get logger instance
 logger = get_logger()
 
+# Circuit breaker for the Prometheus API: after _BREAKER_THRESHOLD consecutive
+# failures every call fails fast for _BREAKER_COOLDOWN seconds (or the
+# server-provided Retry-After, if longer) instead of amplifying an incident
+# with more round-trips.
+_BREAKER = {"fails": 0, "open_until": 0.0}
+_BREAKER_THRESHOLD = 5
+_BREAKER_COOLDOWN = 10.0
+
+
+def _record_breaker_failure(response=None) -> None:
+    """Count a failed Prometheus call and open the circuit past the threshold."""
+    status = getattr(response, "status_code", None)
+    if isinstance(status, int) and 400 <= status < 500 and status != 429:
+        # Client errors (e.g. malformed PromQL) say nothing about Prometheus
+        # health; opening the circuit for them would block good queries too
+        return
+    _BREAKER["fails"] += 1
+    if _BREAKER["fails"] >= _BREAKER_THRESHOLD:
+        cooldown = _BREAKER_COOLDOWN
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if isinstance(retry_after, str) and retry_after.isdigit():
+                cooldown = max(cooldown, float(retry_after))
+        _BREAKER["open_until"] = time.time() + cooldown
+        logger.warning("Prometheus circuit opened", consecutive_failures=_BREAKER["fails"], cooldown=cooldown)
+
+
+# Cache of the last successful lightweight liveness probe so bursts of health
+# checks (container orchestrators, monitoring) don't hammer Prometheus.
+_health_probe_cache = {"timestamp": 0}
+_HEALTH_PROBE_TTL = 10  # seconds
+
+# Constant probe params: Prometheus evaluates at now() when "time" is omitted,
+# so the fallback query probe can reuse one frozen dict instead of rebuilding
+# {"query": "up", "time": str(int(time.time()))} per call.
+_UP_PARAMS = {"query": "up"}
+
+
+def _utc_now_iso() -> str:
+    """Format the current UTC time like datetime.utcnow().isoformat().
+
+    Built from a single time.time_ns() read, avoiding the datetime object
+    allocation (and the deprecated utcnow()) on every health check.
+    """
+    secs, ns = divmod(time.time_ns(), 1_000_000_000)
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(secs)) + f".{ns // 1000:06d}"
+
+
+def _probe_prometheus() -> None:
+    """Check Prometheus connectivity as cheaply as possible, raising on failure.
+
+    Prefers the /-/healthy liveness endpoint, which skips PromQL evaluation
+    entirely, and remembers a success for a short TTL. Falls back to a real
+    instant query for setups where the liveness endpoint is unreachable
+    (older Prometheus versions, restrictive proxies).
+    """
+    now = time.time()
+    if (now - _health_probe_cache["timestamp"]) < _HEALTH_PROBE_TTL:
+        return
+    try:
+        headers, auth = _get_request_auth()
+        response = _SESSION.get(
+            f"{_get_base_url()}/-/healthy",
+            auth=auth,
+            headers=headers,
+            verify=config.url_ssl_verify,
+            timeout=(2, 5),
+        )
+        response.raise_for_status()
+        _health_probe_cache["timestamp"] = now
+        return
+    except requests.exceptions.RequestException as e:
+        logger.debug("Lightweight health endpoint unavailable, falling back to query probe", error=str(e))
+    make_prometheus_request("query", params=_UP_PARAMS)
+
 # Health check tool for Docker containers and monitoring
 @mcp.tool(
     description="Verifica saúde do servidor MCP e conectividade com o Prometheus",
@@ -46,7 +164,7 @@ async def health_check() -> Dict[str, Any]:
             "status": "healthy",
             "service": "prometheus-mcp-server",
             "version": "1.5.0",
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": _utc_now_iso(),
             "transport": config.mcp_server_config.mcp_server_transport if config.mcp_server_config else "stdio",
             "configuration": {
                 "prometheus_url_configured": bool(config.url),
@@ -55,17 +173,25 @@ async def health_check() -> Dict[str, Any]:
             }
         }
         
-        # Test Prometheus connectivity if configured
+        # Test Prometheus connectivity if configured; overlap the probe with
+        # the (cached) targets fetch instead of serializing the round-trips
         if config.url:
-            try:
-                # Quick connectivity test
-                make_prometheus_request("query", params={"query": "up", "time": str(int(time.time()))})
-                health_status["prometheus_connectivity"] = "healthy"
-                health_status["prometheus_url"] = config.url
-            except Exception as e:
+            probe_result, targets = await asyncio.gather(
+                asyncio.to_thread(_probe_prometheus),
+                _get_targets_data(),
+                return_exceptions=True,
+            )
+            if isinstance(probe_result, BaseException):
                 health_status["prometheus_connectivity"] = "unhealthy"
-                health_status["prometheus_error"] = str(e)
+                health_status["prometheus_error"] = str(probe_result)
                 health_status["status"] = "degraded"
+            else:
+                health_status["prometheus_connectivity"] = "healthy"
+                health_status["prometheus_url"] = config.url
+            if not isinstance(targets, BaseException):
+                active = targets.get("activeTargets") if isinstance(targets, dict) else None
+                if isinstance(active, list):
+                    health_status["active_targets"] = len(active)
         else:
             health_status["status"] = "unhealthy"
             health_status["error"] = "PROMETHEUS_URL not configured"
@@ -79,7 +205,7 @@ async def health_check() -> Dict[str, Any]:
             "status": "unhealthy",
             "service": "prometheus-mcp-server",
             "error": str(e),
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": _utc_now_iso()
         }
 
 
@@ -95,7 +221,7 @@ class TransportType(str, Enum):
         """Get all valid transport values."""
         return [transport.value for transport in cls]
 
-@dataclass
+@dataclass(slots=True)
 class MCPServerConfig:
     """Global Configuration for MCP."""
     mcp_server_transport: TransportType = None
@@ -110,8 +236,15 @@ class MCPServerConfig:
             raise ValueError(f"MCP BIND HOST is required")
         if not self.mcp_bind_port:
             raise ValueError(f"MCP BIND PORT is required")
-
-@dataclass
+        try:
+            # Coerce to the enum once at load so later checks are identity
+            # comparisons instead of per-call string lowering
+            self.mcp_server_transport = TransportType(str(self.mcp_server_transport).lower())
+        except ValueError:
+            # Left as-is; setup_environment reports the invalid value
+            pass
+
+@dataclass(slots=True)
 class PrometheusConfig:
     url: str
     url_ssl_verify: bool = True
@@ -127,21 +260,26 @@ class PrometheusConfig:
     # Optional custom headers for Prometheus requests
     custom_headers: Optional[Dict[str, str]] = None
 
-config = PrometheusConfig(
-    url=os.environ.get("PROMETHEUS_URL", ""),
-    url_ssl_verify=os.environ.get("PROMETHEUS_URL_SSL_VERIFY", "True").lower() in ("true", "1", "yes"),
-    disable_prometheus_links=os.environ.get("PROMETHEUS_DISABLE_LINKS", "False").lower() in ("true", "1", "yes"),
-    username=os.environ.get("PROMETHEUS_USERNAME", ""),
-    password=os.environ.get("PROMETHEUS_PASSWORD", ""),
-    token=os.environ.get("PROMETHEUS_TOKEN", ""),
-    org_id=os.environ.get("ORG_ID", ""),
-    mcp_server_config=MCPServerConfig(
-        mcp_server_transport=os.environ.get("PROMETHEUS_MCP_SERVER_TRANSPORT", "stdio").lower(),
-        mcp_bind_host=os.environ.get("PROMETHEUS_MCP_BIND_HOST", "127.0.0.1"),
-        mcp_bind_port=int(os.environ.get("PROMETHEUS_MCP_BIND_PORT", "8080"))
-    ),
-    custom_headers=json.loads(os.environ.get("PROMETHEUS_CUSTOM_HEADERS")) if os.environ.get("PROMETHEUS_CUSTOM_HEADERS") else None,
-)
+@functools.cache
+def _load_config() -> PrometheusConfig:
+    """Parse the environment into a PrometheusConfig exactly once."""
+    return PrometheusConfig(
+        url=os.environ.get("PROMETHEUS_URL", ""),
+        url_ssl_verify=os.environ.get("PROMETHEUS_URL_SSL_VERIFY", "True").lower() in ("true", "1", "yes"),
+        disable_prometheus_links=os.environ.get("PROMETHEUS_DISABLE_LINKS", "False").lower() in ("true", "1", "yes"),
+        username=os.environ.get("PROMETHEUS_USERNAME", ""),
+        password=os.environ.get("PROMETHEUS_PASSWORD", ""),
+        token=os.environ.get("PROMETHEUS_TOKEN", ""),
+        org_id=os.environ.get("ORG_ID", ""),
+        mcp_server_config=MCPServerConfig(
+            mcp_server_transport=os.environ.get("PROMETHEUS_MCP_SERVER_TRANSPORT", "stdio").lower(),
+            mcp_bind_host=os.environ.get("PROMETHEUS_MCP_BIND_HOST", "127.0.0.1"),
+            mcp_bind_port=int(os.environ.get("PROMETHEUS_MCP_BIND_PORT", "8080"))
+        ),
+        custom_headers=json.loads(os.environ.get("PROMETHEUS_CUSTOM_HEADERS")) if os.environ.get("PROMETHEUS_CUSTOM_HEADERS") else None,
+    )
+
+config = _load_config()
 
 def get_prometheus_auth():
     """Get authentication for Prometheus based on provided credentials."""
@@ -151,6 +289,66 @@ def get_prometheus_auth():
         return requests.auth.HTTPBasicAuth(config.username, config.password)
     return None
 
+# Memoized base URL so the hot path and UI-link builders do not rstrip the
+# configured URL on every call. Keyed on config.url to stay correct if the
+# config is mutated at runtime (e.g. in tests).
+_base_url_cache = {"url": None, "base": None}
+
+def _get_base_url() -> str:
+    """Return config.url without its trailing slash, cached per config value."""
+    if config.url != _base_url_cache["url"]:
+        _base_url_cache.update(url=config.url, base=config.url.rstrip("/"))
+    return _base_url_cache["base"]
+
+# Memoized endpoint URLs (query, query_range, label/__name__/values dominate
+# traffic) so the hot path skips the per-call f-string; keyed on the base URL
+# and capped so per-metric metadata endpoints can't grow it unbounded.
+_endpoint_url_cache = {"base": None, "urls": {}}
+_ENDPOINT_URL_CACHE_MAX = 256
+
+def _get_endpoint_url(endpoint: str) -> str:
+    """Return the full API URL for an endpoint, cached per base URL."""
+    base = _get_base_url()
+    if _endpoint_url_cache["base"] != base:
+        _endpoint_url_cache.update(base=base, urls={})
+    urls = _endpoint_url_cache["urls"]
+    url = urls.get(endpoint)
+    if url is None:
+        if len(urls) >= _ENDPOINT_URL_CACHE_MAX:
+            urls.clear()
+        url = f"{base}/api/v1/{endpoint}"
+        urls[endpoint] = url
+    return url
+
+# Memoized (headers, auth) pair so the hot request path does not rebuild the
+# same dicts/HTTPBasicAuth object on every call. Credentials normally never
+# change at runtime; the key guards against config mutation (e.g. in tests).
+_request_auth_cache = {"key": None, "headers": None, "auth": None}
+
+def _get_request_auth():
+    """Return the cached (headers, auth) pair for Prometheus requests."""
+    custom_headers = config.custom_headers
+    key = (
+        config.token,
+        config.username,
+        config.password,
+        config.org_id,
+        None if custom_headers is None else tuple(custom_headers.items()),
+    )
+    if key != _request_auth_cache["key"]:
+        auth = get_prometheus_auth()
+        headers = {}
+        if isinstance(auth, dict):  # Token auth is passed via headers
+            headers.update(auth)
+            auth = None
+        # Add OrgID header if specified
+        if config.org_id:
+            headers["X-Scope-OrgID"] = config.org_id
+        if custom_headers:
+            headers.update(custom_headers)
+        _request_auth_cache.update(key=key, headers=headers, auth=auth)
+    return _request_auth_cache["headers"], _request_auth_cache["auth"]
+
 def make_prometheus_request(endpoint, params=None):
     """Make a request to the Prometheus API with proper authentication and headers."""
     if not config.url:
@@ -158,36 +356,35 @@ def make_prometheus_request(endpoint, params=None):
         raise ValueError("Prometheus configuration is missing. Please set PROMETHEUS_URL environment variable.")
     if not config.url_ssl_verify:
         logger.warning("SSL certificate verification is disabled. This is insecure and should not be used in production environments.", endpoint=endpoint)
+    if time.time() < _BREAKER["open_until"]:
+        logger.warning("Prometheus circuit open, failing fast", endpoint=endpoint)
+        raise ValueError("Prometheus circuit open; skipping request while Prometheus recovers")
 
-    url = f"{config.url.rstrip('/')}/api/v1/{endpoint}"
+    url = _get_endpoint_url(endpoint)
     url_ssl_verify = config.url_ssl_verify
-    auth = get_prometheus_auth()
-    headers = {}
-
-    if isinstance(auth, dict):  # Token auth is passed via headers
-        headers.update(auth)
-        auth = None  # Clear auth for requests.get if it's already in headers
-    
-    # Add OrgID header if specified
-    if config.org_id:
-        headers["X-Scope-OrgID"] = config.org_id
-
-    if config.custom_headers:
-        headers.update(config.custom_headers)
+    headers, auth = _get_request_auth()
 
     try:
-        logger.debug("Making Prometheus API request", endpoint=endpoint, url=url, params=params, headers=headers)
+        # Gate on the effective level so production (INFO) skips the header
+        # copy and rendering entirely, and never log the Authorization header
+        if logging.getLogger("prometheus_mcp_server").isEnabledFor(logging.DEBUG):
+            safe_headers = {k: v for k, v in headers.items() if k.lower() != "authorization"}
+            logger.debug("Making Prometheus API request", endpoint=endpoint, url=url, params=params, headers=safe_headers)
 
         # Make the request with appropriate headers and auth
-        response = requests.get(url, params=params, auth=auth, headers=headers, verify=url_ssl_verify)
+        response = _SESSION.get(url, params=params, auth=auth, headers=headers, verify=url_ssl_verify, timeout=_REQUEST_TIMEOUT)
         
         response.raise_for_status()
-        result = response.json()
+        # orjson parses the raw bytes considerably faster than requests' json()
+        result = orjson.loads(response.content)
         
         if result["status"] != "success":
             error_msg = result.get('error', 'Unknown error')
             logger.error("Prometheus API returned error", endpoint=endpoint, error=error_msg, status=result["status"])
+            _record_breaker_failure(response)
             raise ValueError(f"Prometheus API error: {error_msg}")
+
+        _BREAKER["fails"] = 0
         
         data_field = result.get("data", {})
         if isinstance(data_field, dict):
@@ -198,6 +395,7 @@ def make_prometheus_request(endpoint, params=None):
         return result["data"]
     
     except requests.exceptions.RequestException as e:
+        _record_breaker_failure(getattr(e, "response", None))
         logger.error("HTTP request to Prometheus failed", endpoint=endpoint, url=url, error=str(e), error_type=type(e).__name__)
         raise
     except json.JSONDecodeError as e:
@@ -207,6 +405,25 @@ def make_prometheus_request(endpoint, params=None):
         logger.error("Unexpected error during Prometheus request", endpoint=endpoint, url=url, error=str(e), error_type=type(e).__name__)
         raise
 
+async def _get_targets_data():
+    """Fetch scrape targets through the short-TTL targets cache."""
+    current_time = time.time()
+    if _targets_cache["data"] is not None and (current_time - _targets_cache["timestamp"]) < _TARGETS_CACHE_TTL:
+        logger.debug("Using cached targets", cache_age=current_time - _targets_cache["timestamp"])
+        return _targets_cache["data"]
+    data = await make_prometheus_request_async("targets")
+    _targets_cache.update(data=data, timestamp=current_time)
+    return data
+
+async def make_prometheus_request_async(*args, **kwargs):
+    """Run make_prometheus_request in a worker thread.
+
+    The underlying HTTP call is synchronous (pooled requests.Session); running
+    it via asyncio.to_thread keeps the MCP event loop free so concurrent tool
+    invocations don't serialize behind a single blocking socket read.
+    """
+    return await asyncio.to_thread(make_prometheus_request, *args, **kwargs)
+
 def get_cached_metrics() -> List[str]:
     """Get metrics list with caching to improve completion performance.
 
@@ -225,6 +442,7 @@ def get_cached_metrics() -> List[str]:
     try:
         data = make_prometheus_request("label/__name__/values")
         _metrics_cache["data"] = data
+        _metrics_cache["lower"] = [m.lower() for m in data]
         _metrics_cache["timestamp"] = current_time
         logger.debug("Refreshed metrics cache", metric_count=len(data))
         return data
@@ -262,29 +480,29 @@ async def execute_query(query: str, time: Optional[str] = None) -> Dict[str, Any
         params["time"] = time
     
     logger.info("Executing instant query", query=query, time=time)
-    data = make_prometheus_request("query", params=params)
+    data = await make_prometheus_request_async("query", params=params)
+
+    # Reuse the parsed response dict instead of copying it; a large result can
+    # hold thousands of series and the tool only layers UI links on top.
+    result = data
 
-    result = {
-        "resultType": data["resultType"],
-        "result": data["result"]
-    }
 
     if not config.disable_prometheus_links:
-        from urllib.parse import urlencode
         ui_params = {"g0.expr": query, "g0.tab": "0"}
         if time:
             ui_params["g0.moment_input"] = time
-        prometheus_ui_link = f"{config.url.rstrip('/')}/graph?{urlencode(ui_params)}"
+        prometheus_ui_link = f"{_get_base_url()}/graph?{urlencode(ui_params)}"
         result["links"] = [{
             "href": prometheus_ui_link,
             "rel": "prometheus-ui",
             "title": "Ver no Prometheus UI"
         }]
 
+    result_count = len(data["result"]) if isinstance(data["result"], list) else 1
     logger.info("Instant query completed",
                 query=query,
                 result_type=data["resultType"],
-                result_count=len(data["result"]) if isinstance(data["result"], list) else 1)
+                result_count=result_count)
 
     return result
 
@@ -324,26 +542,25 @@ async def execute_range_query(query: str, start: str, end: str, step: str, ctx:
     if ctx:
         await ctx.report_progress(progress=0, total=100, message="Iniciando consulta de período...")
 
-    data = make_prometheus_request("query_range", params=params)
+    data = await make_prometheus_request_async("query_range", params=params)
 
     # Report progress
     if ctx:
         await ctx.report_progress(progress=50, total=100, message="Processando resultados da consulta...")
 
-    result = {
-        "resultType": data["resultType"],
-        "result": data["result"]
-    }
+    # Same in-place reuse as execute_query: avoid duplicating a matrix that may
+    # carry thousands of series just to attach links.
+    result = data
+
 
     if not config.disable_prometheus_links:
-        from urllib.parse import urlencode
         ui_params = {
             "g0.expr": query,
             "g0.tab": "0",
             "g0.range_input": f"{start} to {end}",
             "g0.step_input": step
         }
-        prometheus_ui_link = f"{config.url.rstrip('/')}/graph?{urlencode(ui_params)}"
+        prometheus_ui_link = f"{_get_base_url()}/graph?{urlencode(ui_params)}"
         result["links"] = [{
             "href": prometheus_ui_link,
             "rel": "prometheus-ui",
@@ -354,10 +571,11 @@ async def execute_range_query(query: str, start: str, end: str, step: str, ctx:
     if ctx:
         await ctx.report_progress(progress=100, total=100, message="Consulta de período concluída")
 
+    result_count = len(data["result"]) if isinstance(data["result"], list) else 1
     logger.info("Consulta de período concluída",
                 query=query,
                 result_type=data["resultType"],
-                result_count=len(data["result"]) if isinstance(data["result"], list) else 1)
+                result_count=result_count)
 
     return result
 
@@ -376,6 +594,7 @@ async def list_metrics(
     limit: Optional[int] = None,
     offset: int = 0,
     filter_pattern: Optional[str] = None,
+    fresh: bool = False,
     ctx: Context | None = None
 ) -> Dict[str, Any]:
     """Obtém a lista de nomes de métricas disponíveis no Prometheus.
@@ -384,6 +603,7 @@ async def list_metrics(
         limit: Maximum number of metrics to return (default: all metrics)
         offset: Number of metrics to skip for pagination (default: 0)
         filter_pattern: Optional substring to filter metric names (case-insensitive)
+        fresh: Bypass the in-process cache and fetch a fresh list
 
     Returns:
         Dictionary containing:
@@ -399,14 +619,19 @@ async def list_metrics(
     if ctx:
         await ctx.report_progress(progress=0, total=100, message="Buscando lista de métricas...")
 
-    data = make_prometheus_request("label/__name__/values")
+    # Serve from the shared TTL cache instead of paying a Prometheus roundtrip
+    # per listing; "fresh" forces an invalidation-based refresh.
+    if fresh:
+        _metrics_cache.update(data=None, lower=None, timestamp=0)
+    data = await asyncio.to_thread(get_cached_metrics)
 
     if ctx:
         await ctx.report_progress(progress=50, total=100, message=f"Processando {len(data)} métricas...")
 
     # Apply filter if provided
     if filter_pattern:
-        filtered_data = [m for m in data if filter_pattern.lower() in m.lower()]
+        pattern = re.compile(re.escape(filter_pattern), re.IGNORECASE)
+        filtered_data = [m for m in data if pattern.search(m)]
         logger.debug("Applied filter", original_count=len(data), filtered_count=len(filtered_data), pattern=filter_pattern)
         data = filtered_data
 
@@ -416,26 +641,49 @@ async def list_metrics(
     start_idx = offset
     end_idx = offset + limit if limit is not None else len(data)
     paginated_data = data[start_idx:end_idx]
+    returned_count = len(paginated_data)
 
     result = {
         "metrics": paginated_data,
         "total_count": total_count,
-        "returned_count": len(paginated_data),
+        "returned_count": returned_count,
         "offset": offset,
         "has_more": end_idx < total_count
     }
 
     if ctx:
-        await ctx.report_progress(progress=100, total=100, message=f"Obtidas {len(paginated_data)} de {total_count} métricas")
+        await ctx.report_progress(progress=100, total=100, message=f"Obtidas {returned_count} de {total_count} métricas")
 
     logger.info("Lista de métricas obtida",
                 total_count=total_count,
-                returned_count=len(paginated_data),
+                returned_count=returned_count,
                 offset=offset,
                 has_more=result["has_more"])
 
     return result
 
+@mcp.tool(
+    description="Força a atualização do cache de nomes de métricas do Prometheus",
+    annotations={
+        "title": "Atualizar cache de métricas",
+        "icon": "♻️",
+        "readOnlyHint": True,
+        "destructiveHint": False,
+        "idempotentHint": True,
+        "openWorldHint": True
+    }
+)
+async def refresh_metrics_cache() -> Dict[str, Any]:
+    """Invalida o cache de métricas e recarrega a lista do Prometheus.
+
+    Útil após mudanças conhecidas na topologia de métricas (novos scrape
+    configs, novos serviços) sem esperar o TTL expirar.
+    """
+    logger.info("Atualizando cache de métricas")
+    _metrics_cache.update(data=None, lower=None, timestamp=0)
+    data = await asyncio.to_thread(get_cached_metrics)
+    return {"metric_count": len(data)}
+
 @mcp.tool(
     description="Busca métricas por prefixo ou trecho do nome (útil para padrões OpenTelemetry/semconv)",
     annotations={
@@ -459,35 +707,104 @@ async def search_metrics(
     if ctx:
         await ctx.report_progress(progress=0, total=100, message="Buscando métricas...")
 
-    data = get_cached_metrics()
+    data = await asyncio.to_thread(get_cached_metrics)
     term = prefix.lower()
-    filtered = [m for m in data if term in m.lower()]
 
+    # Substring scan over the pre-lowercased index; a bisect-able prefix range
+    # can't prove the absence of mid-name matches, so it can't replace this.
+    if data is _metrics_cache["data"] and _metrics_cache["lower"] is not None:
+        lower = _metrics_cache["lower"]
+    else:
+        lower = [m.lower() for m in data]
+    filtered = [data[i] for i, name in enumerate(lower) if term in name]
     total_count = len(filtered)
     start_idx = offset
-    end_idx = offset + limit if limit is not None else len(filtered)
+    end_idx = offset + limit if limit is not None else total_count
     paginated = filtered[start_idx:end_idx]
 
+    returned_count = len(paginated)
     result = {
         "metrics": paginated,
         "total_count": total_count,
-        "returned_count": len(paginated),
+        "returned_count": returned_count,
         "offset": offset,
         "has_more": end_idx < total_count
     }
 
     if ctx:
-        await ctx.report_progress(progress=100, total=100, message=f"Encontradas {len(paginated)} de {total_count} métricas")
+        await ctx.report_progress(progress=100, total=100, message=f"Encontradas {returned_count} de {total_count} métricas")
 
     logger.info("Busca de métricas concluída",
                 prefix=prefix,
                 total_count=total_count,
-                returned_count=len(paginated),
+                returned_count=returned_count,
                 offset=offset,
                 has_more=result["has_more"])
 
     return result
 
+# Frozen catalog of typical semconv metric names, built once at import time so
+# suggest_semconv is a pure dict lookup per call.
+_SEMCONV_CATALOG: Dict[str, list[str]] = {
+    "http": [
+        "http_server_duration_milliseconds_sum",
+        "http_server_duration_milliseconds_count",
+        "http_server_active_requests",
+        "http_server_request_size",
+        "http_server_response_size",
+    ],
+    "http_client": [
+        "http_client_duration_milliseconds_sum",
+        "http_client_duration_milliseconds_count",
+        "http_client_active_requests",
+    ],
+    "rpc": [
+        "rpc_server_duration_milliseconds_sum",
+        "rpc_server_duration_milliseconds_count",
+        "rpc_server_active_requests",
+    ],
+    "db": [
+        "db_client_operation_duration_milliseconds_sum",
+        "db_client_operation_duration_milliseconds_count",
+        "db_client_connections_usage",
+    ],
+    "messaging": [
+        "messaging_operation_duration_milliseconds_sum",
+        "messaging_operation_duration_milliseconds_count",
+        "messaging_clients_active",
+    ],
+    "process": [
+        "process_runtime_jvm_cpu_utilization" ,
+        "process_cpu_seconds_total",
+        "process_resident_memory_bytes",
+        "process_runtime_go_gc_duration_seconds_sum",
+    ],
+    "system": [
+        "system_cpu_utilization",
+        "system_cpu_usage",
+        "system_memory_usage",
+        "system_memory_utilization",
+        "system_filesystem_usage",
+        "system_network_io_bytes",
+        "system_load_average_1m",
+    ],
+    "container": [
+        "container_cpu_usage_seconds_total",
+        "container_memory_usage_bytes",
+        "container_memory_working_set_bytes",
+        "container_network_receive_bytes_total",
+        "container_network_transmit_bytes_total",
+    ],
+    "k8s": [
+        "k8s_pod_cpu_usage",
+        "k8s_pod_memory_usage",
+        "k8s_node_cpu_utilization",
+        "k8s_node_memory_utilization",
+        "k8s_container_restarts_total",
+    ],
+}
+_SEMCONV_DOMAINS = list(_SEMCONV_CATALOG.keys())
+
 @mcp.tool(
     description="Sugere métricas comuns do OpenTelemetry (semconv) por domínio: http, rpc, db, messaging, process, system, container, k8s",
     annotations={
@@ -502,69 +819,11 @@ async def search_metrics(
 async def suggest_semconv(domain: str = "http") -> Dict[str, Any]:
     """Retorna exemplos de métricas semânticas típicas (semconv) para facilitar navegação."""
     domain = domain.lower()
-    catalog: Dict[str, list[str]] = {
-        "http": [
-            "http_server_duration_milliseconds_sum",
-            "http_server_duration_milliseconds_count",
-            "http_server_active_requests",
-            "http_server_request_size",
-            "http_server_response_size",
-        ],
-        "http_client": [
-            "http_client_duration_milliseconds_sum",
-            "http_client_duration_milliseconds_count",
-            "http_client_active_requests",
-        ],
-        "rpc": [
-            "rpc_server_duration_milliseconds_sum",
-            "rpc_server_duration_milliseconds_count",
-            "rpc_server_active_requests",
-        ],
-        "db": [
-            "db_client_operation_duration_milliseconds_sum",
-            "db_client_operation_duration_milliseconds_count",
-            "db_client_connections_usage",
-        ],
-        "messaging": [
-            "messaging_operation_duration_milliseconds_sum",
-            "messaging_operation_duration_milliseconds_count",
-            "messaging_clients_active",
-        ],
-        "process": [
-            "process_runtime_jvm_cpu_utilization" ,
-            "process_cpu_seconds_total",
-            "process_resident_memory_bytes",
-            "process_runtime_go_gc_duration_seconds_sum",
-        ],
-        "system": [
-            "system_cpu_utilization",
-            "system_cpu_usage",
-            "system_memory_usage",
-            "system_memory_utilization",
-            "system_filesystem_usage",
-            "system_network_io_bytes",
-            "system_load_average_1m",
-        ],
-        "container": [
-            "container_cpu_usage_seconds_total",
-            "container_memory_usage_bytes",
-            "container_memory_working_set_bytes",
-            "container_network_receive_bytes_total",
-            "container_network_transmit_bytes_total",
-        ],
-        "k8s": [
-            "k8s_pod_cpu_usage",
-            "k8s_pod_memory_usage",
-            "k8s_node_cpu_utilization",
-            "k8s_node_memory_utilization",
-            "k8s_container_restarts_total",
-        ],
-    }
-    suggestions = catalog.get(domain, [])
+    suggestions = _SEMCONV_CATALOG.get(domain, [])
     return {
         "domain": domain,
         "examples": suggestions,
-        "known_domains": list(catalog.keys()),
+        "known_domains": _SEMCONV_DOMAINS,
     }
 
 @mcp.tool(
@@ -588,8 +847,14 @@ async def get_metric_metadata(metric: str) -> List[Dict[str, Any]]:
         List of metadata entries for the metric
     """
     logger.info("Retrieving metric metadata", metric=metric)
+    current_time = time.time()
+    cached = _metadata_cache.get(metric)
+    if cached is not None and (current_time - cached["timestamp"]) < _METADATA_CACHE_TTL:
+        logger.debug("Using cached metric metadata", metric=metric, cache_age=current_time - cached["timestamp"])
+        return cached["data"]
+
     endpoint = f"metadata?metric={metric}"
-    data = make_prometheus_request(endpoint, params=None)
+    data = await make_prometheus_request_async(endpoint, params=None)
     if "metadata" in data:
         metadata = data["metadata"]
     elif "data" in data:
@@ -598,6 +863,7 @@ async def get_metric_metadata(metric: str) -> List[Dict[str, Any]]:
         metadata = data
     if isinstance(metadata, dict):
         metadata = [metadata]
+    _metadata_cache[metric] = {"data": metadata, "timestamp": current_time}
     logger.info("Metric metadata retrieved", metric=metric, metadata_count=len(metadata))
     return metadata
 
@@ -619,7 +885,7 @@ async def get_targets() -> Dict[str, List[Dict[str, Any]]]:
         Dictionary with active and dropped targets information
     """
     logger.info("Recuperando targets de scrape")
-    data = make_prometheus_request("targets")
+    data = await _get_targets_data()
     
     result = {
         "activeTargets": data["activeTargets"],
@@ -204,11 +204,9 @@ def test_run_server_setup_failure(mock_exit, mock_run, mock_setup):
     mock_run.assert_not_called()
 
 @patch("prometheus_mcp_server.main.config")
-@patch("prometheus_mcp_server.main.dotenv.load_dotenv")
-def test_setup_environment_bearer_token_auth(mock_load_dotenv, mock_config):
+def test_setup_environment_bearer_token_auth(mock_config):
     """Test environment setup with bearer token authentication."""
     # Setup
-    mock_load_dotenv.return_value = False
     mock_config.url = "http://test:9090"
     mock_config.username = ""
     mock_config.password = ""
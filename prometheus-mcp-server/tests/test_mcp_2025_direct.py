@@ -8,6 +8,7 @@ passing (like progress notifications with ctx parameter).
 import pytest
 from unittest.mock import patch, MagicMock, AsyncMock
 from datetime import datetime
+from prometheus_mcp_server import server
 from prometheus_mcp_server.server import (
     execute_query,
     execute_range_query,
@@ -22,6 +23,7 @@ from prometheus_mcp_server.server import (
 @pytest.fixture
 def mock_make_request():
     """Mock the make_prometheus_request function."""
+    server.invalidate_prometheus_caches()
     with patch("prometheus_mcp_server.server.make_prometheus_request") as mock:
         yield mock
 
@@ -13,6 +13,7 @@ import json
 import time
 from unittest.mock import patch, MagicMock, AsyncMock, call
 from fastmcp import Client
+from prometheus_mcp_server import server
 from prometheus_mcp_server.server import (
     mcp,
     get_cached_metrics,
@@ -24,6 +25,7 @@ from prometheus_mcp_server.server import (
 @pytest.fixture
 def mock_make_request():
     """Mock the make_prometheus_request function."""
+    server.invalidate_prometheus_caches()
     with patch("prometheus_mcp_server.server.make_prometheus_request") as mock:
         yield mock
 
@@ -307,6 +309,8 @@ class TestMetricsCaching:
         with patch("prometheus_mcp_server.server.make_prometheus_request") as mock_request:
             mock_request.return_value = ["metric1", "metric2", "metric3"]
 
+            _metrics_cache["data"] = None
+            _metrics_cache["timestamp"] = 0
             result = get_cached_metrics()
 
             assert isinstance(result, list)
@@ -1,9 +1,11 @@
 """Tests for the Prometheus MCP server functionality."""
 
+import json
 import pytest
 import requests
 from unittest.mock import patch, MagicMock
 import asyncio
+from prometheus_mcp_server import server
 from prometheus_mcp_server.server import make_prometheus_request, get_prometheus_auth, config
 
 @pytest.fixture
@@ -11,16 +13,18 @@ def mock_response():
     """Create a mock response object for requests."""
     mock = MagicMock()
     mock.raise_for_status = MagicMock()
-    mock.json.return_value = {
+    payload = {
         "status": "success", 
         "data": {
             "resultType": "vector",
             "result": []
         }
     }
+    mock.json.return_value = payload
+    mock.content = json.dumps(payload).encode()
     return mock
 
-@patch("prometheus_mcp_server.server.requests.get")
+@patch("prometheus_mcp_server.server._SESSION.get")
 def test_make_prometheus_request_no_auth(mock_get, mock_response):
     """Test making a request to Prometheus with no authentication."""
     # Setup
@@ -37,7 +41,7 @@ def test_make_prometheus_request_no_auth(mock_get, mock_response):
     mock_get.assert_called_once()
     assert result == {"resultType": "vector", "result": []}
 
-@patch("prometheus_mcp_server.server.requests.get")
+@patch("prometheus_mcp_server.server._SESSION.get")
 def test_make_prometheus_request_with_basic_auth(mock_get, mock_response):
     """Test making a request to Prometheus with basic authentication."""
     # Setup
@@ -54,7 +58,7 @@ def test_make_prometheus_request_with_basic_auth(mock_get, mock_response):
     mock_get.assert_called_once()
     assert result == {"resultType": "vector", "result": []}
 
-@patch("prometheus_mcp_server.server.requests.get")
+@patch("prometheus_mcp_server.server._SESSION.get")
 def test_make_prometheus_request_with_token_auth(mock_get, mock_response):
     """Test making a request to Prometheus with token authentication."""
     # Setup
@@ -71,13 +75,14 @@ def test_make_prometheus_request_with_token_auth(mock_get, mock_response):
     mock_get.assert_called_once()
     assert result == {"resultType": "vector", "result": []}
 
-@patch("prometheus_mcp_server.server.requests.get")
+@patch("prometheus_mcp_server.server._SESSION.get")
 def test_make_prometheus_request_error(mock_get):
     """Test handling of an error response from Prometheus."""
     # Setup
     mock_response = MagicMock()
     mock_response.raise_for_status = MagicMock()
     mock_response.json.return_value = {"status": "error", "error": "Test error"}
+    mock_response.content = json.dumps({"status": "error", "error": "Test error"}).encode()
     mock_get.return_value = mock_response
     config.url = "http://test:9090"
 
@@ -85,7 +90,7 @@ def test_make_prometheus_request_error(mock_get):
     with pytest.raises(ValueError, match="Prometheus API error: Test error"):
         make_prometheus_request("query", {"query": "up"})
 
-@patch("prometheus_mcp_server.server.requests.get")
+@patch("prometheus_mcp_server.server._SESSION.get")
 def test_make_prometheus_request_connection_error(mock_get):
     """Test handling of connection errors."""
     # Setup
@@ -96,7 +101,7 @@ def test_make_prometheus_request_connection_error(mock_get):
     with pytest.raises(requests.ConnectionError):
         make_prometheus_request("query", {"query": "up"})
 
-@patch("prometheus_mcp_server.server.requests.get")
+@patch("prometheus_mcp_server.server._SESSION.get")
 def test_make_prometheus_request_timeout(mock_get):
     """Test handling of timeout errors."""
     # Setup
@@ -107,7 +112,7 @@ def test_make_prometheus_request_timeout(mock_get):
     with pytest.raises(requests.Timeout):
         make_prometheus_request("query", {"query": "up"})
 
-@patch("prometheus_mcp_server.server.requests.get")
+@patch("prometheus_mcp_server.server._SESSION.get")
 def test_make_prometheus_request_http_error(mock_get):
     """Test handling of HTTP errors."""
     # Setup
@@ -120,28 +125,27 @@ def test_make_prometheus_request_http_error(mock_get):
     with pytest.raises(requests.HTTPError):
         make_prometheus_request("query", {"query": "up"})
 
-@patch("prometheus_mcp_server.server.requests.get")
+@patch("prometheus_mcp_server.server._SESSION.get")
 def test_make_prometheus_request_json_error(mock_get):
     """Test handling of JSON decode errors."""
     # Setup
     mock_response = MagicMock()
     mock_response.raise_for_status = MagicMock()
-    mock_response.json.side_effect = requests.exceptions.JSONDecodeError("Invalid JSON", "", 0)
+    mock_response.content = b"<html>not json</html>"
     mock_get.return_value = mock_response
     config.url = "http://test:9090"
 
-    # Execute and verify
-    with pytest.raises(requests.exceptions.JSONDecodeError):
+    # Execute and verify - decode errors are converted to ValueError
+    with pytest.raises(ValueError, match="Invalid JSON response from Prometheus"):
         make_prometheus_request("query", {"query": "up"})
 
-@patch("prometheus_mcp_server.server.requests.get")
+@patch("prometheus_mcp_server.server._SESSION.get")
 def test_make_prometheus_request_pure_json_decode_error(mock_get):
-    """Test handling of pure json.JSONDecodeError."""
-    import json
+    """Test handling of truncated JSON payloads."""
     # Setup
     mock_response = MagicMock()
     mock_response.raise_for_status = MagicMock()
-    mock_response.json.side_effect = json.JSONDecodeError("Invalid JSON", "", 0)
+    mock_response.content = b'{"status": "success", "data": '
     mock_get.return_value = mock_response
     config.url = "http://test:9090"
 
@@ -149,7 +153,7 @@ def test_make_prometheus_request_pure_json_decode_error(mock_get):
     with pytest.raises(ValueError, match="Invalid JSON response from Prometheus"):
         make_prometheus_request("query", {"query": "up"})
 
-@patch("prometheus_mcp_server.server.requests.get")
+@patch("prometheus_mcp_server.server._SESSION.get")
 def test_make_prometheus_request_missing_url(mock_get):
     """Test make_prometheus_request with missing URL configuration."""
     # Setup
@@ -163,7 +167,7 @@ def test_make_prometheus_request_missing_url(mock_get):
     # Cleanup
     config.url = original_url
 
-@patch("prometheus_mcp_server.server.requests.get")
+@patch("prometheus_mcp_server.server._SESSION.get")
 def test_make_prometheus_request_with_org_id(mock_get, mock_response):
     """Test making a request with org_id header."""
     # Setup
@@ -188,7 +192,7 @@ def test_make_prometheus_request_with_org_id(mock_get, mock_response):
     # Cleanup
     config.org_id = original_org_id
 
-@patch("prometheus_mcp_server.server.requests.get")
+@patch("prometheus_mcp_server.server._SESSION.get")
 def test_make_prometheus_request_request_exception(mock_get):
     """Test handling of generic request exceptions."""
     # Setup
@@ -199,7 +203,7 @@ def test_make_prometheus_request_request_exception(mock_get):
     with pytest.raises(requests.exceptions.RequestException):
         make_prometheus_request("query", {"query": "up"})
 
-@patch("prometheus_mcp_server.server.requests.get") 
+@patch("prometheus_mcp_server.server._SESSION.get") 
 def test_make_prometheus_request_response_error(mock_get):
     """Test handling of response errors from Prometheus."""
     # Setup - mock HTTP error response
@@ -213,7 +217,7 @@ def test_make_prometheus_request_response_error(mock_get):
     with pytest.raises(requests.HTTPError):
         make_prometheus_request("query", {"query": "up"})
 
-@patch("prometheus_mcp_server.server.requests.get")
+@patch("prometheus_mcp_server.server._SESSION.get")
 def test_make_prometheus_request_generic_exception(mock_get):
     """Test handling of unexpected exceptions."""
     # Setup
@@ -224,16 +228,18 @@ def test_make_prometheus_request_generic_exception(mock_get):
     with pytest.raises(Exception, match="Unexpected error"):
         make_prometheus_request("query", {"query": "up"})
 
-@patch("prometheus_mcp_server.server.requests.get")
+@patch("prometheus_mcp_server.server._SESSION.get")
 def test_make_prometheus_request_list_data_format(mock_get):
     """Test make_prometheus_request with list data format."""
     # Setup - mock response with list data format
     mock_response = MagicMock()
     mock_response.raise_for_status = MagicMock()
-    mock_response.json.return_value = {
+    payload = {
         "status": "success", 
         "data": [{"metric": {}, "value": [1609459200, "1"]}]  # List format instead of dict
     }
+    mock_response.json.return_value = payload
+    mock_response.content = json.dumps(payload).encode()
     mock_get.return_value = mock_response
     config.url = "http://test:9090"
 
@@ -243,7 +249,7 @@ def test_make_prometheus_request_list_data_format(mock_get):
     # Verify
     assert result == [{"metric": {}, "value": [1609459200, "1"]}]
 
-@patch("prometheus_mcp_server.server.requests.get")
+@patch("prometheus_mcp_server.server._SESSION.get")
 def test_make_prometheus_request_ssl_verify_true(mock_get, mock_response):
     """Test making a request to Prometheus with SSL verification enabled."""
     # Setup
@@ -258,7 +264,7 @@ def test_make_prometheus_request_ssl_verify_true(mock_get, mock_response):
     mock_get.assert_called_once()
     assert result == {"resultType": "vector", "result": []}
 
-@patch("prometheus_mcp_server.server.requests.get")
+@patch("prometheus_mcp_server.server._SESSION.get")
 def test_make_prometheus_request_ssl_verify_false(mock_get, mock_response):
     """Test making a request to Prometheus with SSL verification disabled."""
     # Setup
@@ -273,7 +279,7 @@ def test_make_prometheus_request_ssl_verify_false(mock_get, mock_response):
     mock_get.assert_called_once()
     assert result == {"resultType": "vector", "result": []}
 
-@patch("prometheus_mcp_server.server.requests.get")
+@patch("prometheus_mcp_server.server._SESSION.get")
 def test_make_prometheus_request_with_custom_headers(mock_get, mock_response):
     """Test making a request with custom headers."""
     # Setup
@@ -298,7 +304,7 @@ def test_make_prometheus_request_with_custom_headers(mock_get, mock_response):
     # Cleanup
     config.custom_headers = original_custom_headers
 
-@patch("prometheus_mcp_server.server.requests.get")
+@patch("prometheus_mcp_server.server._SESSION.get")
 def test_make_prometheus_request_with_multiple_custom_headers(mock_get, mock_response):
     """Test making a request with multiple custom headers."""
     # Setup
@@ -331,7 +337,7 @@ def test_make_prometheus_request_with_multiple_custom_headers(mock_get, mock_res
     # Cleanup
     config.custom_headers = original_custom_headers
 
-@patch("prometheus_mcp_server.server.requests.get")
+@patch("prometheus_mcp_server.server._SESSION.get")
 def test_make_prometheus_request_with_custom_headers_and_token_auth(mock_get, mock_response):
     """Test making a request with custom headers combined with token authentication."""
     # Setup
@@ -362,7 +368,7 @@ def test_make_prometheus_request_with_custom_headers_and_token_auth(mock_get, mo
     config.custom_headers = original_custom_headers
     config.token = ""
 
-@patch("prometheus_mcp_server.server.requests.get")
+@patch("prometheus_mcp_server.server._SESSION.get")
 def test_make_prometheus_request_with_custom_headers_and_org_id(mock_get, mock_response):
     """Test making a request with custom headers combined with org_id."""
     # Setup
@@ -392,7 +398,7 @@ def test_make_prometheus_request_with_custom_headers_and_org_id(mock_get, mock_r
     config.custom_headers = original_custom_headers
     config.org_id = original_org_id
 
-@patch("prometheus_mcp_server.server.requests.get")
+@patch("prometheus_mcp_server.server._SESSION.get")
 def test_make_prometheus_request_with_empty_custom_headers(mock_get, mock_response):
     """Test making a request with empty custom headers dictionary."""
     # Setup
@@ -411,7 +417,7 @@ def test_make_prometheus_request_with_empty_custom_headers(mock_get, mock_respon
     # Cleanup
     config.custom_headers = original_custom_headers
 
-@patch("prometheus_mcp_server.server.requests.get")
+@patch("prometheus_mcp_server.server._SESSION.get")
 def test_make_prometheus_request_with_none_custom_headers(mock_get, mock_response):
     """Test making a request with None custom headers."""
     # Setup
@@ -430,7 +436,7 @@ def test_make_prometheus_request_with_none_custom_headers(mock_get, mock_respons
     # Cleanup
     config.custom_headers = original_custom_headers
 
-@patch("prometheus_mcp_server.server.requests.get")
+@patch("prometheus_mcp_server.server._SESSION.get")
 def test_make_prometheus_request_with_custom_headers_and_basic_auth(mock_get, mock_response):
     """Test making a request with custom headers combined with basic authentication."""
     # Setup
@@ -463,7 +469,7 @@ def test_make_prometheus_request_with_custom_headers_and_basic_auth(mock_get, mo
     config.username = ""
     config.password = ""
 
-@patch("prometheus_mcp_server.server.requests.get")
+@patch("prometheus_mcp_server.server._SESSION.get")
 def test_make_prometheus_request_with_all_headers_combined(mock_get, mock_response):
     """Test making a request with custom headers, org_id, and token auth all combined."""
     # Setup
@@ -504,3 +510,45 @@ def test_make_prometheus_request_with_all_headers_combined(mock_get, mock_respon
     config.org_id = original_org_id
     config.token = ""
 
+
+@patch("prometheus_mcp_server.server._SESSION.get")
+def test_make_prometheus_request_circuit_breaker(mock_get):
+    """Test that repeated transport failures open the circuit breaker."""
+    # Setup
+    server._BREAKER.update(fails=0, open_until=0.0)
+    mock_get.side_effect = requests.ConnectionError("Connection failed")
+    config.url = "http://test:9090"
+
+    # Execute - each failure propagates until the threshold trips the breaker
+    for _ in range(server._BREAKER_THRESHOLD):
+        with pytest.raises(requests.ConnectionError):
+            make_prometheus_request("query", {"query": "up"})
+
+    # Verify - the next call fails fast without touching the network
+    call_count = mock_get.call_count
+    with pytest.raises(ValueError, match="circuit open"):
+        make_prometheus_request("query", {"query": "up"})
+    assert mock_get.call_count == call_count
+
+    # Cleanup
+    server._BREAKER.update(fails=0, open_until=0.0)
+
+@patch("prometheus_mcp_server.server._SESSION.get")
+def test_make_prometheus_request_client_errors_do_not_open_breaker(mock_get):
+    """Test that 4xx client errors don't count toward the circuit breaker."""
+    # Setup
+    server._BREAKER.update(fails=0, open_until=0.0)
+    mock_response = MagicMock()
+    mock_response.status_code = 400
+    mock_response.raise_for_status.side_effect = requests.HTTPError("Bad Request", response=mock_response)
+    mock_get.return_value = mock_response
+    config.url = "http://test:9090"
+
+    # Execute - even past the threshold, bad queries only fail themselves
+    for _ in range(server._BREAKER_THRESHOLD + 1):
+        with pytest.raises(requests.HTTPError):
+            make_prometheus_request("query", {"query": "bad{"})
+
+    # Verify - circuit stayed closed
+    assert server._BREAKER["fails"] == 0
+    assert server._BREAKER["open_until"] == 0.0
@@ -4,11 +4,13 @@ import pytest
 import json
 from unittest.mock import patch, MagicMock
 from fastmcp import Client
+from prometheus_mcp_server import server
 from prometheus_mcp_server.server import mcp, execute_query, execute_range_query, list_metrics, get_metric_metadata, get_targets
 
 @pytest.fixture
 def mock_make_request():
     """Mock the make_prometheus_request function."""
+    server.invalidate_prometheus_caches()
     with patch("prometheus_mcp_server.server.make_prometheus_request") as mock:
         yield mock
 
@@ -1,4 +1,6 @@
+import asyncio
 import os
+import sys
 import time
 from typing import Dict, List
 
@@ -6,14 +8,15 @@ import dotenv
 from fastapi import FastAPI, HTTPException, Request
 from opentelemetry import metrics
 from opentelemetry.metrics import Observation
+from opentelemetry.exporter.otlp.proto.grpc.exporter import Compression
 from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import OTLPMetricExporter
 from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
 from opentelemetry.instrumentation.requests import RequestsInstrumentor
-from opentelemetry.sdk.metrics import MeterProvider
-from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+from opentelemetry.sdk.metrics import Counter, Histogram, MeterProvider
+from opentelemetry.sdk.metrics.export import AggregationTemporality, PeriodicExportingMetricReader
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.semconv.resource import ResourceAttributes
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 dotenv.load_dotenv()
 
@@ -43,11 +46,24 @@ resource_attributes: Dict[str, str] = {
 resource_attributes.update(parse_resource_attributes(os.getenv("OTEL_RESOURCE_ATTRIBUTES")))
 resource = Resource.create(resource_attributes)
 
+# Batched export tuned for sustained RPS: gzip shrinks every export payload,
+# delta temporality keeps exported point counts bounded for counters and
+# histograms, and the interval is operator-tunable via the standard env var.
 metric_exporter = OTLPMetricExporter(
     endpoint=os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4317"),
     insecure=True,
+    compression=Compression.Gzip,
+    preferred_temporality={
+        Counter: AggregationTemporality.DELTA,
+        Histogram: AggregationTemporality.DELTA,
+    },
+)
+# strip('"') tolerates quoted values from list-style compose environment
+# entries, which Docker passes through verbatim
+metric_reader = PeriodicExportingMetricReader(
+    metric_exporter,
+    export_interval_millis=int(os.getenv("OTEL_METRIC_EXPORT_INTERVAL", "5000").strip('"')),
 )
-metric_reader = PeriodicExportingMetricReader(metric_exporter, export_interval_millis=5000)
 provider = MeterProvider(resource=resource, metric_readers=[metric_reader])
 metrics.set_meter_provider(provider)
 meter = metrics.get_meter(resource_attributes[ResourceAttributes.SERVICE_NAME])
@@ -67,11 +83,19 @@ latency_histogram = meter.create_histogram(
     unit="ms",
 )
 
-# In-memory store to expose a simple gauge-like signal
-orders: List[dict] = []
+# In-memory store to expose a simple gauge-like signal, indexed by item_id so
+# deletes are a dict pop instead of a full-list rescan
+orders: Dict[int, List[dict]] = {}
+pending_orders = 0
+# Serializes store mutations: without the lock, concurrent create/delete
+# handlers can interleave the counter's read-modify-write and leave the
+# pending-orders gauge permanently skewed.
+_orders_lock = asyncio.Lock()
 
 
 class Order(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     item_id: int
     quantity: int
 
@@ -80,7 +104,7 @@ class Order(BaseModel):
 async def setup_telemetry() -> None:
     # Observable gauge to track current pending orders without manual updates
     def observe_pending_orders(_options) -> list[Observation]:
-        return [Observation(value=len(orders))]
+        return [Observation(value=pending_orders)]
 
     meter.create_observable_gauge(
         name="demo_pending_orders",
@@ -89,17 +113,34 @@ async def setup_telemetry() -> None:
     )
 
 
+# Attribute dicts reused per (method, path, status): the label set is small
+# and stable, so the middleware doesn't allocate a fresh dict per request.
+# Capped because raw paths carry ids (/items/123) and could grow unbounded.
+_ATTRIBUTE_CACHE: Dict[tuple, dict] = {}
+_ATTRIBUTE_CACHE_MAX = 1024
+
+
 @app.middleware("http")
 async def record_request_metrics(request: Request, call_next):
+    # Liveness probes arrive at orchestrator frequency and say nothing about
+    # real traffic; skip the counter + histogram cost for them.
+    if request.url.path == "/health":
+        return await call_next(request)
+
     start = time.perf_counter()
     response = await call_next(request)
     elapsed_ms = (time.perf_counter() - start) * 1000
 
-    attributes = {
-        "http.method": request.method,
-        "http.route": request.url.path,
-        "http.status_code": response.status_code,
-    }
+    key = (request.method, request.url.path, response.status_code)
+    attributes = _ATTRIBUTE_CACHE.get(key)
+    if attributes is None:
+        attributes = {
+            "http.method": sys.intern(request.method),
+            "http.route": sys.intern(request.url.path),
+            "http.status_code": response.status_code,
+        }
+        if len(_ATTRIBUTE_CACHE) < _ATTRIBUTE_CACHE_MAX:
+            _ATTRIBUTE_CACHE[key] = attributes
     request_counter.add(1, attributes=attributes)
     latency_histogram.record(elapsed_ms, attributes=attributes)
 
@@ -116,23 +157,30 @@ async def get_item(item_id: int, slow: bool = False) -> dict:
     if item_id < 0:
         raise HTTPException(status_code=400, detail="item_id must be positive")
 
-    # Optional latency injection to make the histogram interesting
+    # Optional latency injection to make the histogram interesting; async so
+    # the event loop keeps serving other requests during the wait
     if slow:
-        time.sleep(0.4)
+        await asyncio.sleep(0.4)
 
     return {"item_id": item_id, "detail": "Sample item", "slow_path": slow}
 
 
 @app.post("/orders")
 async def create_order(order: Order) -> dict:
-    payload = order.dict()
-    orders.append(payload)
-    return {"status": "created", "order": payload, "pending_orders": len(orders)}
+    global pending_orders
+    payload = order.model_dump()
+    async with _orders_lock:
+        orders.setdefault(order.item_id, []).append(payload)
+        pending_orders += 1
+        pending = pending_orders
+    return {"status": "created", "order": payload, "pending_orders": pending}
 
 
 @app.delete("/orders/{item_id}")
 async def clear_order(item_id: int) -> dict:
-    global orders
-    before = len(orders)
-    orders = [o for o in orders if o["item_id"] != item_id]
-    return {"status": "deleted", "removed": before - len(orders), "pending_orders": len(orders)}
+    global pending_orders
+    async with _orders_lock:
+        removed = len(orders.pop(item_id, []))
+        pending_orders -= removed
+        pending = pending_orders
+    return {"status": "deleted", "removed": removed, "pending_orders": pending}
@@ -1,12 +1,17 @@
+import asyncio
+import hashlib
 import json
 import os
 import re
+import time
+from collections import OrderedDict
 from typing import Any, Dict, Optional
 
 import dotenv
 import httpx
+import orjson
 from fastapi import FastAPI, Form, HTTPException, Request
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse
 from fastapi.templating import Jinja2Templates
 
 dotenv.load_dotenv()
@@ -16,9 +21,31 @@ OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434")
 LLAMA_MODEL = os.getenv("LLAMA_MODEL", "llama3.2:1b")
 MCP_SERVER_URL = os.getenv("MCP_SERVER_URL", "")
 
+# Shared HTTP clients so every request reuses pooled keepalive connections
+# instead of opening (and tearing down) a fresh one per call. Per-call
+# timeouts keep the original per-operation budgets.
+# http2=True permite multiplexar chamadas concorrentes numa única conexão
+# quando o upstream negocia HTTP/2; sobre HTTP/1.1 o httpx degrada sozinho.
+prometheus_client = httpx.AsyncClient(base_url=PROMETHEUS_URL, timeout=20, http2=True)
+ollama_client = httpx.AsyncClient(base_url=OLLAMA_URL, timeout=45, http2=True)
+
+# Limites de concorrência por upstream: o Ollama degrada rápido além da sua
+# concorrência ótima (CPU/GPU-bound), e o Prometheus não precisa de fan-out
+# ilimitado. Um pouco de fila melhora muito o p95/p99.
+_OLLAMA_SEM = asyncio.Semaphore(int(os.getenv("OLLAMA_MAX_CONCURRENCY", "4")))
+_PROM_SEM = asyncio.Semaphore(int(os.getenv("PROMETHEUS_MAX_CONCURRENCY", "16")))
+
 templates = Jinja2Templates(directory="templates")
-templates.env.filters["tojson"] = lambda value, **kwargs: json.dumps(value, **kwargs)
-app = FastAPI(title="Prometheus Prompt UI", version="0.1.0")
+def _tojson_filter(value, indent: int | None = None) -> str:
+    # orjson serializa em C; OPT_INDENT_2 cobre o tojson(indent=2) do template
+    return orjson.dumps(value, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+
+
+templates.env.filters["tojson"] = _tojson_filter
+# Compila o template uma única vez; cada render vira só a execução do
+# bytecode Jinja, sem lookup/parsing por requisição.
+_INDEX_TEMPLATE = templates.get_template("index.html")
+app = FastAPI(title="Prometheus Prompt UI", version="0.1.0", default_response_class=ORJSONResponse)
 
 SYSTEM_PROMPT = """Você é um especialista em PromQL.
 Responda com APENAS uma consulta PromQL, sem texto extra e sem cercas de código.
@@ -37,77 +64,193 @@ Métricas conhecidas (amostra):
 """
 
 
+# Cache TTL da lista de nomes de métricas: o conjunto muda na escala de
+# minutos, então cada /prompt não precisa de um roundtrip ao Prometheus.
+_METRICS_CACHE: tuple[float, list[str]] | None = None
+_METRICS_TTL = 30.0  # segundos
+_metrics_cache_lock = asyncio.Lock()
+
+# Nomes em minúsculas pré-computados a cada refresh do cache acima, para a
+# filtragem por palavras-chave não re-alocar .lower() por nome a cada prompt.
+_LOWER_NAMES: dict[str, str] = {}
+
+_WORD_RE = re.compile(r"[a-zA-Z0-9_]+")
+
+
 async def fetch_metric_names(limit: int = 30) -> list[str]:
     """Fetch a sample of metric names from Prometheus to ground the LLM."""
-    try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.get(f"{PROMETHEUS_URL}/api/v1/label/__name__/values")
+    global _METRICS_CACHE
+    if _METRICS_CACHE is not None and time.monotonic() - _METRICS_CACHE[0] < _METRICS_TTL:
+        return _METRICS_CACHE[1][:limit]
+
+    # O lock evita que uma rajada de requisições simultâneas dispare várias
+    # buscas idênticas enquanto o cache está frio.
+    async with _metrics_cache_lock:
+        if _METRICS_CACHE is not None and time.monotonic() - _METRICS_CACHE[0] < _METRICS_TTL:
+            return _METRICS_CACHE[1][:limit]
+        try:
+            async with _PROM_SEM:
+                resp = await prometheus_client.get("/api/v1/label/__name__/values", timeout=10)
             resp.raise_for_status()
-            data = resp.json()
+            data = orjson.loads(resp.content)
             if data.get("status") != "success":
                 return []
             values = data.get("data", [])
-            values = [v for v in values if isinstance(v, str)]
+            values = _prioritize_otel_metrics([v for v in values if isinstance(v, str)])
+            _METRICS_CACHE = (time.monotonic(), values)
+            _LOWER_NAMES.clear()
+            _LOWER_NAMES.update((v, v.lower()) for v in values)
             return values[:limit]
-    except Exception:
-        return []
+        except Exception:
+            return []
 
 
 def _filter_metrics_by_prompt(metric_names: list[str], prompt: str, limit: int = 10) -> list[str]:
-    keywords = {w.lower() for w in re.findall(r"[a-zA-Z0-9_]+", prompt) if len(w) > 3}
+    keywords = {w.lower() for w in _WORD_RE.findall(prompt) if len(w) > 3}
     if not keywords:
         return metric_names[:limit]
-    filtered = [m for m in metric_names if any(k in m.lower() for k in keywords)]
+    # Uma única varredura C por nome (alternação compilada) em vez de um loop
+    # Python de substrings por palavra-chave
+    pattern = re.compile("|".join(map(re.escape, keywords)))
+    filtered = [
+        m for m in metric_names
+        if pattern.search(_LOWER_NAMES.get(m) or m.lower())
+    ]
     if not filtered:
         return metric_names[:limit]
     return filtered[:limit]
 
 
+_PREFERRED_PREFIXES = ("demo_", "http_", "otelcol_", "scrape_", "up")
+
+
+def _otel_sort_key(name: str) -> tuple[int, str]:
+    return (0 if name.startswith(_PREFERRED_PREFIXES) else 1, name)
+
+
 def _prioritize_otel_metrics(metric_names: list[str]) -> list[str]:
-    """Ordena colocando métricas do app/HTTP/OTel antes das de runtime."""
-    preferred_prefixes = ("demo_", "http_", "otelcol_", "scrape_", "up")
-    def sort_key(name: str) -> tuple[int, str]:
-        score = 1
-        if name.startswith(preferred_prefixes):
-            score = 0
-        return (score, name)
-    return sorted(metric_names, key=sort_key)
+    """Ordena colocando métricas do app/HTTP/OTel antes das de runtime.
+
+    Aplicada uma vez por refresh do cache de métricas, não por prompt.
+    """
+    return sorted(metric_names, key=_otel_sort_key)
+
+
+# Cache LRU+TTL de respostas do LLM: prompts idênticos produzem o mesmo
+# PromQL e a mesma explicação, então repetições voltam sem custo de geração.
+_OLLAMA_CACHE: OrderedDict = OrderedDict()
+_OLLAMA_CACHE_MAX = 1024
+_OLLAMA_CACHE_TTL = 300.0  # 5 minutos
+_ollama_cache_lock = asyncio.Lock()
+
+
+# Constantes reutilizadas em todas as chamadas ao Ollama
+_OLLAMA_OPTIONS = {"temperature": 0.2}
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def _ollama_cache_key(text: str) -> str:
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+async def _cached_ollama(cache_key: str, prompt_text: str) -> str:
+    """Retorna a resposta do Ollama para o prompt, com cache LRU + TTL."""
+    now = time.monotonic()
+    async with _ollama_cache_lock:
+        cached = _OLLAMA_CACHE.get(cache_key)
+        if cached is not None:
+            value, expires_at = cached
+            if now < expires_at:
+                _OLLAMA_CACHE.move_to_end(cache_key)
+                return value
+            del _OLLAMA_CACHE[cache_key]
+
+    # Serializa o corpo uma única vez fora da chamada; httpx não refaz o
+    # json.dumps e o mesmo bytes poderia ser reenviado em retries.
+    body = orjson.dumps({
+        "model": LLAMA_MODEL,
+        "prompt": prompt_text,
+        "stream": True,
+        "options": _OLLAMA_OPTIONS,
+    })
+    # Consome a geração em streaming: os tokens chegam conforme são gerados,
+    # erros abortam cedo e a resposta nunca é bufferizada duas vezes.
+    chunks: list[str] = []
+    async with _OLLAMA_SEM:
+        async with ollama_client.stream("POST", "/api/generate", content=body, headers=_JSON_HEADERS) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                chunk = orjson.loads(line)
+                piece = chunk.get("response")
+                if piece:
+                    chunks.append(piece)
+                if chunk.get("done"):
+                    break
+    value = "".join(chunks).strip()
+    if not value:
+        # Não memoriza respostas vazias: costumam ser falhas transitórias do
+        # Ollama e ficariam presas no cache pelo TTL inteiro
+        return value
+
+    async with _ollama_cache_lock:
+        _OLLAMA_CACHE[cache_key] = (value, now + _OLLAMA_CACHE_TTL)
+        _OLLAMA_CACHE.move_to_end(cache_key)
+        while len(_OLLAMA_CACHE) > _OLLAMA_CACHE_MAX:
+            _OLLAMA_CACHE.popitem(last=False)
+    return value
 
 
 async def call_ollama(prompt: str) -> str:
     """Chama o modelo llama3 via Ollama e extrai apenas a consulta."""
-    metric_names = _prioritize_otel_metrics(await fetch_metric_names())
+    # A lista já vem priorizada do refresh do cache
+    metric_names = await fetch_metric_names()
     filtered_metrics = _filter_metrics_by_prompt(metric_names, prompt) if metric_names else []
     metric_hint = ""
     if filtered_metrics:
         metric_hint = f"\nMétricas relacionadas ao pedido (amostra): {', '.join(filtered_metrics)}\n"
     elif metric_names:
         metric_hint = f"\nMétricas disponíveis (amostra): {', '.join(metric_names[:10])}\n"
-    payload = {
-        "model": LLAMA_MODEL,
-        "prompt": f"{SYSTEM_PROMPT}{metric_hint}\nPedido do usuário: {prompt}\n\nPromQL:",
-        "stream": False,
-        "options": {"temperature": 0.2},
-    }
-    async with httpx.AsyncClient(timeout=45) as client:
-        response = await client.post(f"{OLLAMA_URL}/api/generate", json=payload)
-        response.raise_for_status()
-        data = response.json()
-        query_text = data.get("response", "").strip()
-        return re.sub(r"^`+|`+$", "", query_text)
+    full_prompt = f"{SYSTEM_PROMPT}{metric_hint}\nPedido do usuário: {prompt}\n\nPromQL:"
+    query_text = await _cached_ollama(_ollama_cache_key(full_prompt), full_prompt)
+    return re.sub(r"^`+|`+$", "", query_text)
 
 
 async def query_prometheus(promql: str) -> Dict[str, Any]:
     """Dispara a consulta gerada contra o Prometheus."""
-    async with httpx.AsyncClient(timeout=20) as client:
-        resp = await client.get(
-            f"{PROMETHEUS_URL}/api/v1/query", params={"query": promql}
-        )
-        resp.raise_for_status()
-        payload = resp.json()
-        if payload.get("status") != "success":
-            raise HTTPException(status_code=502, detail="Prometheus query failed")
-        return payload
+    async with _PROM_SEM:
+        resp = await prometheus_client.get("/api/v1/query", params={"query": promql})
+    resp.raise_for_status()
+    payload = orjson.loads(resp.content)
+    if payload.get("status") != "success":
+        raise HTTPException(status_code=502, detail="Prometheus query failed")
+    return payload
+
+
+def _summarize_result(result: Dict[str, Any], limit: int = 2000) -> str:
+    """Serializa apenas uma amostra do payload para o prompt de explicação.
+
+    Em vez de fazer dump do resultado inteiro (potencialmente MBs) e jogar
+    fora 99% na fatia, corta para as 20 primeiras séries e os 5 últimos
+    pontos de cada uma antes de serializar.
+    """
+    data = result.get("data", {}) if isinstance(result, dict) else {}
+    series = data.get("result", []) if isinstance(data, dict) else []
+    if isinstance(series, list):
+        sample = []
+        for entry in series[:20]:
+            values = entry.get("values") if isinstance(entry, dict) else None
+            if isinstance(values, list) and len(values) > 5:
+                entry = {**entry, "values": values[-5:]}
+            sample.append(entry)
+    else:
+        sample = series
+    trimmed = {
+        "status": result.get("status"),
+        "data": {"resultType": data.get("resultType") if isinstance(data, dict) else None, "result": sample},
+    }
+    return json.dumps(trimmed, separators=(",", ":"))[:limit]
 
 
 async def explain_result(prompt: str, promql: str, result: Dict[str, Any]) -> str:
@@ -120,19 +263,16 @@ Explique em uma frase curta, em português, o que o resultado abaixo diz, consid
 
 Pedido do usuário: {prompt}
 PromQL: {promql}
-Resultado bruto: {json.dumps(result)[:2000]}
+Resultado bruto: {_summarize_result(result)}
 """
-    payload = {
-        "model": LLAMA_MODEL,
-        "prompt": summary_prompt,
-        "stream": False,
-        "options": {"temperature": 0.2},
-    }
-    async with httpx.AsyncClient(timeout=45) as client:
-        response = await client.post(f"{OLLAMA_URL}/api/generate", json=payload)
-        response.raise_for_status()
-        data = response.json()
-        return data.get("response", "").strip()
+    # O summary_prompt embute pedido, PromQL e resultado, então serve de chave
+    return await _cached_ollama(_ollama_cache_key(summary_prompt), summary_prompt)
+
+
+@app.on_event("shutdown")
+async def close_http_clients() -> None:
+    await prometheus_client.aclose()
+    await ollama_client.aclose()
 
 
 @app.get("/health")
@@ -142,19 +282,16 @@ async def health() -> dict:
 
 @app.get("/", response_class=HTMLResponse)
 async def index(request: Request) -> HTMLResponse:
-    return templates.TemplateResponse(
-        "index.html",
-        {
-            "request": request,
-            "query": None,
-            "result": None,
-            "error": None,
-            "prompt": "",
-            "prometheus_url": PROMETHEUS_URL,
-            "mcp_server_url": MCP_SERVER_URL,
-            "model": LLAMA_MODEL,
-        },
-    )
+    return HTMLResponse(_INDEX_TEMPLATE.render(
+        request=request,
+        query=None,
+        result=None,
+        error=None,
+        prompt="",
+        prometheus_url=PROMETHEUS_URL,
+        mcp_server_url=MCP_SERVER_URL,
+        model=LLAMA_MODEL,
+    ))
 
 
 @app.post("/prompt", response_class=HTMLResponse)
@@ -174,17 +311,14 @@ async def handle_prompt(request: Request, prompt: str = Form(...)) -> HTMLRespon
     except Exception as exc:  # noqa: BLE001 - surface readable error to the UI
         error = str(exc)
 
-    return templates.TemplateResponse(
-        "index.html",
-        {
-            "request": request,
-            "query": query,
-            "result": result,
-            "error": error,
-            "prompt": prompt,
-            "natural_answer": natural_answer,
-            "prometheus_url": PROMETHEUS_URL,
-            "mcp_server_url": MCP_SERVER_URL,
-            "model": LLAMA_MODEL,
-        },
-    )
+    return HTMLResponse(_INDEX_TEMPLATE.render(
+        request=request,
+        query=query,
+        result=result,
+        error=error,
+        prompt=prompt,
+        natural_answer=natural_answer,
+        prometheus_url=PROMETHEUS_URL,
+        mcp_server_url=MCP_SERVER_URL,
+        model=LLAMA_MODEL,
+    ))